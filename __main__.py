@@ -1,7 +1,14 @@
+import asyncio
 import random
+import itertools
 import csv
+import heapq
+import json
 import os
 import sys
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # Optional extras
@@ -25,31 +32,101 @@ except ImportError:
 KEYWORDS = ["full stack", "mern stack", "mern", "website","website development","web development"]
 VIDEO_LIMIT = 10
 FEEDBACK_FILE = "yt_feedback.csv"
+PREFETCH_LIMIT = 10  # transcripts fetched up front for the likeliest picks
+FEEDBACK_INDEX = "yt_feedback.idx"  # one JSON [link, keyword, feedback] per line
 MIN_DURATION = 60  # Skip Shorts
 BACKEND = "yt_dlp"  # yt_dlp | youtubesearch
 LANG_WHITELIST = ["en", "hi"]  # English, Hindi
 
 
+@dataclass(slots=True)
+class Video:
+    keyword: str
+    title: str
+    link: str
+    id: str
+    channel: str
+    duration: int
+    upload_date: str | None = None  # YYYYMMDD
+    description: str = ""
+    language: str = "unknown"
+    upload_ts: float | None = None  # upload_date as POSIX time
+
+
+def _parse_upload_ts(upload_date):
+    """Parse a YYYYMMDD string to a POSIX timestamp; None if missing/malformed."""
+    if not upload_date:
+        return None
+    try:
+        return datetime.strptime(upload_date, "%Y%m%d").timestamp()
+    except ValueError:
+        return None
+
+
 # === Summarizer ===
+def _transcript_lines(transcript, max_chars=300, max_lines=40):
+    """Yield caption text until enough has been read to summarize."""
+    total = 0
+    for item in itertools.islice(transcript, max_lines):
+        text = item["text"]
+        yield text
+        total += len(text) + 1
+        if total >= max_chars:
+            return
+
+
 def get_transcript_summary(video_id):
     """Try to fetch transcript and summarize it."""
     if YouTubeTranscriptApi is None:
         return None
     try:
         transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=LANG_WHITELIST)
-        text = " ".join([t["text"] for t in transcript[:40]])  # first ~40 lines
+        text = " ".join(_transcript_lines(transcript))
         return summarize_text(text)
     except Exception:
         return None
 
 
+def prefetch_summaries(pool, videos, feedback_memory, limit=PREFETCH_LIMIT):
+    """Queue summaries for the `limit` highest-weighted unrated videos; returns {video id: Future}."""
+    if YouTubeTranscriptApi is None:
+        return {}
+    likely = heapq.nlargest(
+        limit, _candidate_weights(videos, feedback_memory, feedback_memory), key=lambda vw: vw[1]
+    )
+    return {v.id: pool.submit(get_transcript_summary, v.id) for v, _ in likely}
+
+
 def summarize_text(text, max_len=220):
     """Very simple summarizer: cut + compress sentences."""
-    sentences = text.replace("\n", " ").split(". ")
-    if len(sentences) > 4:
-        sentences = sentences[:4]
+    # Only the first 4 sentences are kept, so stop splitting after them
+    sentences = text.replace("\n", " ").split(". ", 4)[:4]
     summary = ". ".join(sentences)
-    return summary[:max_len] + ("..." if len(summary) > max_len else "")
+    if len(summary) <= max_len:
+        return summary
+    # Cut at the last word boundary (one char past max_len, so a word ending
+    # exactly at max_len survives); fall back to a hard cut for one long word
+    cut = summary[:max_len + 1].rpartition(" ")[0] or summary[:max_len]
+    return cut + "..."
+
+
+# === Fetch videos ===
+def _search_all(search_one, keywords):
+    """Run `search_one` for every keyword concurrently; dedupe videos by id."""
+    all_videos = []
+    if not keywords:
+        return all_videos
+    seen_ids = set()
+    # Searches are network-bound, so run them concurrently
+    with ThreadPoolExecutor(max_workers=min(8, len(keywords))) as ex:
+        # map() keeps keyword order, so a video keeps its first-listed keyword
+        for part in ex.map(search_one, keywords):
+            for v in part:
+                if v.id in seen_ids:
+                    continue
+                seen_ids.add(v.id)
+                all_videos.append(v)
+    return all_videos
 
 
 # === Fetch videos using yt_dlp ===
@@ -58,188 +135,313 @@ def fetch_videos_yt_dlp(keywords, limit=10):
         print("❌ yt_dlp not installed. Run: pip install yt-dlp")
         sys.exit(1)
 
-    all_videos = []
     ydl_opts = {
         "quiet": True,
         "extract_flat": True,
         "skip_download": True,
         "noplaylist": True,
+        # Stay on the flat search page: no per-video metadata requests
+        "playlist_items": f"1-{limit}",
+        "extractor_args": {"youtubetab": {"approximate_date": ["timestamp"]}},
     }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        for kw in keywords:
-            search = f"ytsearch{limit}:{kw}"
-            try:
+
+    def _search_one(kw):
+        # One YoutubeDL per search: instances are not safe to share across threads
+        search = f"ytsearch{limit}:{kw}"
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 results = ydl.extract_info(search, download=False)
-            except Exception as e:
-                print(f"⚠️ Error fetching {kw}: {e}")
+        except Exception as e:
+            print(f"⚠️ Error fetching {kw}: {e}")
+            return []
+        videos = []
+        for e in results.get("entries", []):
+            duration = e.get("duration") or 0
+            if duration < MIN_DURATION:
                 continue
-            for e in results.get("entries", []):
-                duration = e.get("duration") or 0
-                if duration < MIN_DURATION:
-                    continue
-                # Language check (yt_dlp sometimes provides "language" field)
-                lang = e.get("language")
-                if lang and lang.split("-")[0] not in LANG_WHITELIST:
-                    continue
-                vid = {
-                    "keyword": kw,
-                    "title": e.get("title", "No Title"),
-                    "link": f"https://www.youtube.com/watch?v={e['id']}",
-                    "id": e["id"],
-                    "channel": e.get("channel", "Unknown"),
-                    "description": e.get("description", "") or "",
-                    "duration": duration,
-                    "upload_date": e.get("upload_date"),  # YYYYMMDD
-                    "language": lang or "unknown",
-                }
-                all_videos.append(vid)
-    return all_videos
+            # Language check (yt_dlp sometimes provides "language" field)
+            lang = e.get("language")
+            if lang and lang.split("-")[0] not in LANG_WHITELIST:
+                continue
+            vid = Video(
+                keyword=kw,
+                title=e.get("title", "No Title"),
+                link=f"https://www.youtube.com/watch?v={e['id']}",
+                id=e["id"],
+                channel=e.get("channel", "Unknown"),
+                duration=duration,
+                upload_date=e.get("upload_date"),
+                description=e.get("description") or "",
+                language=lang or "unknown",
+                upload_ts=_parse_upload_ts(e.get("upload_date")),
+            )
+            videos.append(vid)
+        return videos
+
+    return _search_all(_search_one, keywords)
 
 
 # === Fetch videos using youtubesearchpython ===
+def _parse_duration(duration_str):
+    """Seconds from "SS", "MM:SS" or "HH:MM:SS"; 0 if unparseable."""
+    p = duration_str.split(":")
+    n = len(p)
+    try:
+        if n == 1:
+            return int(p[0])
+        if n == 2:
+            return int(p[0]) * 60 + int(p[1])
+        if n == 3:
+            return int(p[0]) * 3600 + int(p[1]) * 60 + int(p[2])
+    except ValueError:
+        pass
+    return 0
+
+
 def fetch_videos_ytsp(keywords, limit=10):
     if VideosSearch is None:
         print("❌ youtubesearchpython not installed. Run: pip install youtube-search-python")
         sys.exit(1)
 
-    all_videos = []
-    for kw in keywords:
+    def _search_one(kw):
         try:
             search = VideosSearch(kw, limit=limit)
             results = search.result()["result"]
         except Exception as e:
             print(f"⚠️ Error fetching {kw}: {e}")
-            continue
+            return []
+        videos = []
         for v in results:
-            duration_str = v.get("duration", "0:00")
-            try:
-                parts = list(map(int, duration_str.split(":")))
-                duration = sum(x * 60**i for i, x in enumerate(reversed(parts)))
-            except:
-                duration = 0
+            duration = _parse_duration(v.get("duration") or "0:00")
             if duration < MIN_DURATION:
                 continue
-            vid = {
-                "keyword": kw,
-                "title": v.get("title", "No Title"),
-                "link": v.get("link", ""),
-                "id": v.get("id", ""),
-                "channel": v.get("channel", {}).get("name", "Unknown"),
-                "description": (v.get("descriptionSnippet") or [{}])[0].get("text", ""),
-                "duration": duration,
-                "upload_date": None,
-                "language": "unknown",
-            }
-            all_videos.append(vid)
-    return all_videos
+            vid = Video(
+                keyword=kw,
+                title=v.get("title", "No Title"),
+                link=v.get("link", ""),
+                id=v.get("id", ""),
+                channel=v.get("channel", {}).get("name", "Unknown"),
+                duration=duration,
+                description=(v.get("descriptionSnippet") or [{}])[0].get("text", ""),
+            )
+            videos.append(vid)
+        return videos
+
+    return _search_all(_search_one, keywords)
 
 
 # === Load feedback ===
+def _read_index():
+    feedback = {}
+    with open(FEEDBACK_INDEX, "r", encoding="utf-8") as f:
+        for line in f:
+            link, keyword, fb = json.loads(line)
+            feedback[link] = {"keyword": keyword, "feedback": fb}
+    return feedback
+
+
 def load_feedback():
     if not os.path.isfile(FEEDBACK_FILE):
         return {}
+    # The index is appended right after each CSV row, so it is only stale
+    # if the CSV was modified behind our back. The CSV is the real record, so a
+    # missing or unreadable index just means rebuilding it.
+    try:
+        if os.path.getmtime(FEEDBACK_INDEX) >= os.path.getmtime(FEEDBACK_FILE):
+            return _read_index()
+    except Exception:
+        pass
+
     feedback = {}
-    with open(FEEDBACK_FILE, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+    with open(FEEDBACK_FILE, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
         for row in reader:
-            feedback[row["link"]] = row
+            # Columns: 1 = keyword, 3 = link, 6 = feedback
+            if len(row) > 6:
+                feedback[row[3]] = {"keyword": row[1], "feedback": row[6]}
+    # Refreshing the index is best effort; the parsed feedback is all we need
+    try:
+        with open(FEEDBACK_INDEX, "w", encoding="utf-8") as f:
+            for link, fb in feedback.items():
+                f.write(json.dumps([link, fb["keyword"], fb["feedback"]]) + "\n")
+    except OSError:
+        pass
     return feedback
 
 
 # === Save feedback ===
-def save_feedback(video, feedback, summary=None):
-    file_exists = os.path.isfile(FEEDBACK_FILE)
-    with open(FEEDBACK_FILE, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            "timestamp", "keyword", "title", "link", "channel",
-            "duration", "feedback", "summary", "upload_date", "language"
-        ])
-        if not file_exists:
-            writer.writeheader()
-        writer.writerow({
-            "timestamp": datetime.now().isoformat(),
-            "keyword": video["keyword"],
-            "title": video["title"],
-            "link": video["link"],
-            "channel": video["channel"],
-            "duration": video["duration"],
-            "feedback": feedback,
-            "summary": summary or "",
-            "upload_date": video.get("upload_date", ""),
-            "language": video.get("language", ""),
-        })
+FEEDBACK_FIELDS = (
+    "timestamp", "keyword", "title", "link", "channel",
+    "duration", "feedback", "summary", "upload_date", "language"
+)
+
+
+def open_feedback_writer():
+    """Open the feedback CSV and index for appending; returns (file, writer, index)."""
+    # Line-buffered so every row hits disk even if the session is killed
+    f = open(FEEDBACK_FILE, "a", newline="", encoding="utf-8", buffering=1)
+    writer = csv.writer(f)
+    # Append mode opens at the end, so position 0 means a new (or empty) file;
+    # no separate stat that could race with the open
+    new_file = f.tell() == 0
+    if new_file:
+        writer.writerow(FEEDBACK_FIELDS)
+    try:
+        index = open(FEEDBACK_INDEX, "w" if new_file else "a", encoding="utf-8", buffering=1)
+    except OSError:
+        # Index can't be written: discard its records. The CSV then ends up
+        # newer than the index, so the next load_feedback() rebuilds from it.
+        index = open(os.devnull, "w")
+    return f, writer, index
+
+
+def save_feedback(writer, index, video, feedback, summary=None):
+    # Same order as FEEDBACK_FIELDS
+    writer.writerow((
+        datetime.now().isoformat(),
+        video.keyword,
+        video.title,
+        video.link,
+        video.channel,
+        video.duration,
+        feedback,
+        summary or "",
+        video.upload_date or "",
+        video.language,
+    ))
+    index.write(json.dumps([video.link, video.keyword, feedback]) + "\n")
 
 
 # === Pick video smartly ===
-def pick_video(videos, feedback_memory):
-    candidates = [v for v in videos if v["link"] not in feedback_memory]
-    if not candidates:
-        return None
+FEEDBACK_BONUS = {"definitely": 3, "maybe": 1}
 
-    weights = []
-    for v in candidates:
-        base = 1
-        # Keyword boost
-        for fb in feedback_memory.values():
-            if fb["keyword"] == v["keyword"]:
-                if fb["feedback"] == "definitely":
-                    base += 3
-                elif fb["feedback"] == "maybe":
-                    base += 1
-                elif fb["feedback"] == "never":
-                    base = 0
+
+def _candidate_weights(videos, feedback_memory, seen_links, exclude=None):
+    """Yield (video, weight) for every video that may still be recommended."""
+    # Fold feedback into per-keyword (bonus, banned) once
+    kw_state = {}
+    for fb in feedback_memory.values():
+        bonus, banned = kw_state.get(fb["keyword"], (0, False))
+        if fb["feedback"] == "never":
+            banned = True
+        else:
+            bonus += FEEDBACK_BONUS.get(fb["feedback"], 0)
+        kw_state[fb["keyword"]] = (bonus, banned)
+
+    cutoff_ts = (datetime.now() - timedelta(days=180)).timestamp()
+    for v in videos:
+        if v.link in seen_links or v.link == exclude:
+            continue
+        bonus, banned = kw_state.get(v.keyword, (0, False))
+        if banned:
+            continue
+        base = 1 + bonus
         # Recency boost (last 6 months)
-        if v.get("upload_date"):
-            try:
-                upload_dt = datetime.strptime(v["upload_date"], "%Y%m%d")
-                if upload_dt > datetime.now() - timedelta(days=180):
-                    base += 2
-            except:
-                pass
-        weights.append(base)
+        if v.upload_ts is not None and v.upload_ts > cutoff_ts:
+            base += 2
+        yield v, base
 
-    candidates = [v for v, w in zip(candidates, weights) if w > 0]
-    weights = [w for w in weights if w > 0]
 
-    if not candidates:
-        return None
-    return random.choices(candidates, weights=weights, k=1)[0]
+def pick_video(videos, feedback_memory, seen_links, exclude=None):
+    # Weighted reservoir sampling (A-Res, k=1): keep the video with the largest
+    # u ** (1 / weight), so no candidate/weight lists are built
+    best, best_key = None, -1.0
+    for v, weight in _candidate_weights(videos, feedback_memory, seen_links, exclude):
+        key = random.random() ** (1 / weight)
+        if key > best_key:
+            best, best_key = v, key
+    return best
 
 
 # === Main loop ===
-def interactive_loop(videos):
-    feedback_memory = load_feedback()
-
-    while True:
-        video = pick_video(videos, feedback_memory)
-        if not video:
-            print("\n🎉 No more new videos to recommend. Come back later!")
-            break
+def _run_in_daemon(func, *args):
+    """Run `func` on a daemon thread; returns an asyncio Future for its result.
 
-        # Try AI summary
-        summary = get_transcript_summary(video["id"]) or summarize_text(
-            video.get("description") or video["title"]
-        )
+    Unlike the default executor, daemon threads are never joined on shutdown,
+    so a pending input() or transcript fetch can't hold up quit or Ctrl-C.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
 
-        print("\n🎥 Recommended Video:")
-        print("Title:", video["title"])
-        print("Channel:", video["channel"])
-        print("Duration:", f"{video['duration']}s")
-        if video.get("upload_date"):
-            print("Uploaded:", video["upload_date"])
-        print("Language:", video.get("language", "unknown"))
-        print("Link:", video["link"])
-        print("Summary:", summary, "\n")
+    def _resolve(setter, value):
+        if not future.done():
+            setter(value)
 
-        feedback = input("Do you want to watch it? (never/maybe/definitely/quit): ").strip().lower()
-        if feedback == "quit":
-            break
-        elif feedback in ["never", "maybe", "definitely"]:
-            save_feedback(video, feedback, summary)
-            feedback_memory[video["link"]] = video | {"feedback": feedback}
-            print("✅ Feedback saved!\n")
-        else:
-            print("⚠️ Invalid input. Try again.")
+    def run():
+        try:
+            outcome = (future.set_result, func(*args))
+        except BaseException as exc:
+            outcome = (future.set_exception, exc)
+        try:
+            loop.call_soon_threadsafe(_resolve, *outcome)
+        except RuntimeError:
+            pass  # loop already closed
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _warm_summary(summaries, video):
+    """Start fetching `video`'s transcript summary now unless it is already underway."""
+    if video is None or YouTubeTranscriptApi is None:
+        return
+    future = summaries.get(video.id)
+    if isinstance(future, asyncio.Future):
+        # An earlier warm-up: keep it unless it finished without a summary
+        if not future.done() or future.result() is not None:
+            return
+    elif future is not None and not future.cancel():
+        # Pool job already running or finished; cancel() only wins while it is queued
+        return
+    summaries[video.id] = _run_in_daemon(get_transcript_summary, video.id)
+
+
+async def interactive_loop(videos, feedback_memory, summaries=None):
+    summaries = {} if summaries is None else summaries
+    seen_links = set(feedback_memory)
+    f, writer, index = open_feedback_writer()
+    with f, index:
+        video = pick_video(videos, feedback_memory, seen_links)
+        while True:
+            if not video:
+                print("\n🎉 No more new videos to recommend. Come back later!")
+                break
+
+            # Use the prefetched transcript summary if it has already arrived
+            future = summaries.get(video.id)
+            summary = future.result() if future and future.done() else None
+            summary = summary or summarize_text(video.description or video.title)
+
+            print("\n🎥 Recommended Video:")
+            print("Title:", video.title)
+            print("Channel:", video.channel)
+            print("Duration:", f"{video.duration}s")
+            if video.upload_date:
+                print("Uploaded:", video.upload_date)
+            print("Language:", video.language)
+            print("Link:", video.link)
+            print("Summary:", summary, "\n")
+
+            # Cache hint only: start a likely next video's transcript while the user
+            # decides. What is actually shown is drawn after the feedback is recorded.
+            _warm_summary(summaries, pick_video(videos, feedback_memory, seen_links, exclude=video.link))
+
+            feedback = await _run_in_daemon(
+                input, "Do you want to watch it? (never/maybe/definitely/quit): "
+            )
+            feedback = feedback.strip().lower()
+            if feedback == "quit":
+                break
+            elif feedback in ["never", "maybe", "definitely"]:
+                save_feedback(writer, index, video, feedback, summary)
+                # Same shape as load_feedback(): pick_video only reads these two
+                feedback_memory[video.link] = {"keyword": video.keyword, "feedback": feedback}
+                seen_links.add(video.link)
+                print("✅ Feedback saved!\n")
+                video = pick_video(videos, feedback_memory, seen_links)
+            else:
+                print("⚠️ Invalid input. Try again.")
 
 
 if __name__ == "__main__":
@@ -248,7 +450,14 @@ if __name__ == "__main__":
     else:
         videos = fetch_videos_ytsp(KEYWORDS, limit=VIDEO_LIMIT)
 
-    interactive_loop(videos)
+    feedback_memory = load_feedback()
+    # Fetch transcripts in the background while the user reads
+    pool = ThreadPoolExecutor(max_workers=8)
+    summaries = prefetch_summaries(pool, videos, feedback_memory)
+    try:
+        asyncio.run(interactive_loop(videos, feedback_memory, summaries))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 import random
 import csv
 import os